@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""Detect which CloudFormation resources are affected by a set of changes.
+
+Diffs two git revisions, matches the changed files against the resource
+mappings in change-detection-config.yaml and writes a change-metadata.json
+summary consumed by prepare_change_meta.py and validate_change_impact.py.
+Run directly or through change_pipeline.py.
+"""
+
+import fnmatch
+import re
+import subprocess
+import sys
+from collections import defaultdict, namedtuple
+from functools import lru_cache
+
+from jsonio import dump_sidecar, dumps
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
+
+DEFAULT_CONFIG_PATH = "scripts/pre-ci/change-detection-config.yaml"
+DEFAULT_OUTPUT_PATH = "change-metadata.json"
+
+# affected_resources is stored column-wise: one parallel list per field, with
+# row i spread across the columns. This stores each field name once instead
+# of once per row and lets consumers scan a single column without touching
+# the rest.
+RESOURCE_COLUMNS = (
+    "file",
+    "mapping",
+    "resource_type",
+    "impact_level",
+    "target_stack",
+    "description",
+)
+
+# One mapping's config, flattened so the match loop reads fixed attribute
+# slots instead of hashing the same dict keys per match.
+MappingRec = namedtuple(
+    "MappingRec",
+    (
+        "key",
+        "patterns",
+        "resource_type",
+        "impact_level",
+        "target_stack",
+        "description",
+        "required_actions",
+        "is_all",
+    ),
+)
+
+
+def prep_mappings(resource_mappings):
+    return {
+        key: MappingRec(
+            key,
+            tuple(cfg.get("patterns", [])),
+            cfg.get("resource_type"),
+            cfg.get("impact_level"),
+            cfg.get("target_stack"),
+            cfg.get("description"),
+            frozenset(cfg.get("required_actions", [])),
+            cfg.get("target_stack") == "all",
+        )
+        for key, cfg in resource_mappings.items()
+    }
+
+
+def load_change_detection_config(config_path):
+    # Deferred so PyYAML is only imported when the config is actually loaded.
+    from yaml_cache import load_yaml_cached
+
+    return load_yaml_cached(config_path)
+
+
+class GitDiffError(Exception):
+    """Raised when the diff between two revisions cannot be computed."""
+
+
+def get_changed_files(base_commit, head_commit):
+    """List the paths that changed between two revisions.
+
+    Uses pygit2 (libgit2) when available, which diffs in-process without the
+    fork/exec and stdout parsing of a git subprocess; falls back to
+    `git diff --name-only` otherwise. Either backend raises GitDiffError on
+    bad revisions.
+    """
+    if pygit2 is not None:
+        repo = pygit2.Repository(".")
+        try:
+            base_oid = repo.revparse_single(base_commit).peel(pygit2.Commit).id
+            head_oid = repo.revparse_single(head_commit).peel(pygit2.Commit).id
+            merge_base = repo.merge_base(base_oid, head_oid)
+            diff = repo.diff(merge_base, head_oid)
+        except (KeyError, pygit2.GitError) as exc:
+            # revparse_single raises a bare KeyError for unknown revisions.
+            raise GitDiffError(f"unknown revision or git error: {exc}") from exc
+        # git diff runs rename detection by default; without this a rename
+        # shows up as two deltas (old and new path) instead of one.
+        diff.find_similar()
+        return [delta.new_file.path for delta in diff.deltas]
+
+    try:
+        result = subprocess.run(
+            ["git", "diff", "--name-only", f"{base_commit}...{head_commit}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as exc:
+        raise GitDiffError(exc.stderr.strip()) from exc
+    return [line for line in result.stdout.splitlines() if line]
+
+
+def compile_patterns(patterns):
+    """Compile a list of glob patterns into a single union regex.
+
+    Translating and unioning up front means each path is tested with one
+    regex match instead of one fnmatch call (and its internal re.compile)
+    per pattern.
+    """
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns))
+
+
+def build_pattern_owners(resource_mappings):
+    """Map each unique glob to the mapping keys that declare it.
+
+    Mappings commonly share globs (broad rules like config/* or *.yaml);
+    indexing by pattern means each one is compiled and matched once, with
+    hits routed back to every owning mapping.
+    """
+    pattern_owners = {}
+    for key, cfg in resource_mappings.items():
+        for pattern in cfg.get("patterns", []):
+            pattern_owners.setdefault(pattern, []).append(key)
+    return pattern_owners
+
+
+def build_matcher(exclusion_patterns, resource_mappings):
+    """Return match_files(normalized_paths) -> {path: [mapping_key, ...]}.
+
+    The regex backend iterates pattern-major: each unique compiled pattern
+    is swept across the whole file list in one filter pass, so per-pattern
+    setup happens once per run rather than once per file. The hyperscan
+    backend already scans all patterns per path in a single pass.
+    """
+    if hyperscan is not None:
+        return _build_hyperscan_matcher(exclusion_patterns, resource_mappings)
+
+    excluded_re = compile_patterns(exclusion_patterns) if exclusion_patterns else None
+    compiled = [
+        (re.compile(fnmatch.translate(pattern)), owners)
+        for pattern, owners in build_pattern_owners(resource_mappings).items()
+    ]
+
+    def match_files(paths):
+        # Collapse duplicate paths so each unique path is matched once.
+        paths = list(dict.fromkeys(paths))
+        if excluded_re is not None:
+            paths = [path for path in paths if not excluded_re.match(path)]
+        matches_by_file = defaultdict(list)
+        for pattern_re, owners in compiled:
+            for path in filter(pattern_re.match, paths):
+                matches_by_file[path].extend(owners)
+        # A mapping may own several patterns that match the same file.
+        return {
+            path: tuple(dict.fromkeys(keys))
+            for path, keys in matches_by_file.items()
+        }
+
+    return match_files
+
+
+def _build_hyperscan_matcher(exclusion_patterns, resource_mappings):
+    def database(patterns):
+        # fnmatch.translate relies on re.match's implicit start anchor, but
+        # db.scan is an unanchored search, so anchor explicitly with ^; \Z is
+        # unsupported, so anchor the end with $ (paths contain no newlines).
+        expressions = [
+            ("^" + fnmatch.translate(p).replace(r"\Z", "$")).encode()
+            for p in patterns
+        ]
+        db = hyperscan.Database()
+        db.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions),
+        )
+        return db
+
+    pattern_owners = build_pattern_owners(resource_mappings)
+    id_to_owners = list(pattern_owners.values())
+    mapping_db = database(list(pattern_owners))
+    exclusion_db = database(exclusion_patterns) if exclusion_patterns else None
+
+    def scan(db, path):
+        hits = []
+        db.scan(
+            path.encode(),
+            match_event_handler=lambda pattern_id, *_args: hits.append(pattern_id),
+        )
+        return hits
+
+    @lru_cache(maxsize=None)
+    def match_keys(path):
+        if exclusion_db is not None and scan(exclusion_db, path):
+            return ()
+        # dict.fromkeys dedups mappings matched via several patterns.
+        return tuple(
+            dict.fromkeys(
+                key for i in scan(mapping_db, path) for key in id_to_owners[i]
+            )
+        )
+
+    def match_files(paths):
+        matches_by_file = {}
+        for path in dict.fromkeys(paths):
+            keys = match_keys(path)
+            if keys:
+                matches_by_file[path] = keys
+        return matches_by_file
+
+    return match_files
+
+
+def write_change_metadata(change_metadata, output_path):
+    """Write the metadata JSON, serializing affected_resources per column.
+
+    The resource columns grow linearly with the change set, so each one is
+    dumped and written separately instead of buffering a dumps() of the
+    whole document; the remaining keys are small and written in one piece
+    each.
+    """
+    with open(output_path, "wb") as f:
+        f.write(b"{\n")
+        first = True
+        for key, value in change_metadata.items():
+            if not first:
+                f.write(b",\n")
+            first = False
+            f.write(b'  "' + key.encode("utf-8") + b'": ')
+            if key == "affected_resources":
+                f.write(b"{")
+                for i, column in enumerate(RESOURCE_COLUMNS):
+                    f.write(b",\n    " if i else b"\n    ")
+                    f.write(b'"' + column.encode("utf-8") + b'": ')
+                    f.write(dumps(value[column]))
+                f.write(b"\n  }")
+            else:
+                f.write(dumps(value))
+        f.write(b"\n}\n")
+
+
+def collect_affected_resources(
+    changed_files, normalized_paths, matches_by_file, mapping_recs, checklist_config
+):
+    """Aggregate the match results into the metadata containers.
+
+    Deliberately free of I/O, parsing and config access — it only walks
+    plain lists, dicts and MappingRec tuples — so the whole traversal could
+    be compiled as an extension module if match volume ever warrants it.
+    """
+    resources = {column: [] for column in RESOURCE_COLUMNS}
+    affected_mappings = set()
+    required_actions = set()
+    checklist = {key: False for key in checklist_config}
+    all_stacks_triggered = False
+
+    # Bind the per-column appends once; the loop then calls locals instead
+    # of re-resolving attribute lookups on every match.
+    append_file = resources["file"].append
+    append_mapping = resources["mapping"].append
+    append_resource_type = resources["resource_type"].append
+    append_impact_level = resources["impact_level"].append
+    append_target_stack = resources["target_stack"].append
+    append_description = resources["description"].append
+    update_affected_mappings = affected_mappings.update
+    update_required_actions = required_actions.update
+
+    for file_path, normalized_path in zip(changed_files, normalized_paths):
+        mapping_keys = matches_by_file.get(normalized_path, ())
+        if not mapping_keys:
+            continue
+        update_affected_mappings(mapping_keys)
+        for mapping_key in mapping_keys:
+            rec = mapping_recs[mapping_key]
+            append_file(file_path)
+            append_mapping(rec.key)
+            append_resource_type(rec.resource_type)
+            append_impact_level(rec.impact_level)
+            append_target_stack(rec.target_stack)
+            append_description(rec.description)
+            update_required_actions(rec.required_actions)
+            if rec.is_all:
+                # Note it once; the whole checklist is flipped after the loop.
+                all_stacks_triggered = True
+            elif rec.target_stack in checklist:
+                checklist[rec.target_stack] = True
+
+    if all_stacks_triggered:
+        checklist = {key: True for key in checklist_config}
+    return resources, affected_mappings, required_actions, checklist
+
+
+def run_change_detection(base_commit, head_commit, config_path, output_path):
+    config = load_change_detection_config(config_path)
+    exclusion_patterns = config.get("exclusions", {}).get("patterns", [])
+    resource_mappings = config.get("resource_mappings", {})
+    deployment_checklist_config = config.get("deployment_checklist", {})
+
+    match_files = build_matcher(exclusion_patterns, resource_mappings)
+    mapping_recs = prep_mappings(resource_mappings)
+
+    changed_files = get_changed_files(base_commit, head_commit)
+    # Normalize separators once up front; the matchers only ever see
+    # forward-slash paths.
+    normalized_paths = [path.replace("\\", "/") for path in changed_files]
+
+    resources, affected_mappings, required_actions, checklist = (
+        collect_affected_resources(
+            changed_files,
+            normalized_paths,
+            match_files(normalized_paths),
+            mapping_recs,
+            deployment_checklist_config,
+        )
+    )
+
+    change_metadata = {
+        "base_commit": base_commit,
+        "head_commit": head_commit,
+        "changed_files": changed_files,
+        "affected_resources": resources,
+        "affected_mappings": sorted(affected_mappings),
+        "required_actions": sorted(required_actions),
+        "deployment_checklist": checklist,
+    }
+
+    write_change_metadata(change_metadata, output_path)
+    dump_sidecar(change_metadata, output_path)
+
+    print(
+        f"Detected {len(change_metadata['affected_resources']['file'])} affected resource(s) "
+        f"across {len(change_metadata['affected_mappings'])} mapping(s); "
+        f"metadata written to {output_path}"
+    )
+    return change_metadata
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base", required=True, help="Base commit or ref")
+    parser.add_argument("--head", default="HEAD", help="Head commit or ref")
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    args = parser.parse_args()
+
+    try:
+        run_change_detection(args.base, args.head, args.config, args.output)
+    except GitDiffError as exc:
+        print(f"git diff failed: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
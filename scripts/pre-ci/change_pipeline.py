@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Single-process driver for the pre-CI change pipeline.
+
+Exposes detect, prepare and validate as subcommands of one interpreter
+invocation; the all subcommand runs the three phases back to back, handing
+the detection result to the later phases in memory so nothing is re-parsed.
+The JSON artifacts are still written for debugging and later jobs.
+"""
+
+import sys
+
+import change_detection
+import prepare_change_meta
+import validate_change_impact
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    detect = subparsers.add_parser("detect", help="map changed files to resources")
+    prepare = subparsers.add_parser("prepare", help="derive deployment decisions")
+    validate = subparsers.add_parser("validate", help="check the change metadata")
+    run_all = subparsers.add_parser("all", help="run every phase in one process")
+
+    for sub in (detect, run_all):
+        sub.add_argument("--base", required=True, help="Base commit or ref")
+        sub.add_argument("--head", default="HEAD", help="Head commit or ref")
+        sub.add_argument("--config", default=change_detection.DEFAULT_CONFIG_PATH)
+    detect.add_argument("--output", default=change_detection.DEFAULT_OUTPUT_PATH)
+
+    prepare.add_argument("--metadata", default=prepare_change_meta.DEFAULT_METADATA_PATH)
+    prepare.add_argument("--config", default=prepare_change_meta.DEFAULT_CONFIG_PATH)
+    prepare.add_argument("--output", default=prepare_change_meta.DEFAULT_OUTPUT_PATH)
+
+    validate.add_argument(
+        "--metadata", default=validate_change_impact.DEFAULT_METADATA_PATH
+    )
+
+    run_all.add_argument(
+        "--metadata-output", default=change_detection.DEFAULT_OUTPUT_PATH
+    )
+    run_all.add_argument("--output", default=prepare_change_meta.DEFAULT_OUTPUT_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "detect":
+        try:
+            change_detection.run_change_detection(
+                args.base, args.head, args.config, args.output
+            )
+        except change_detection.GitDiffError as exc:
+            print(f"git diff failed: {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.command == "prepare":
+        prepare_change_meta.prepare_change_metadata(
+            args.metadata, args.config, args.output
+        )
+        return 0
+
+    if args.command == "validate":
+        metadata = validate_change_impact.load_change_metadata(args.metadata)
+        errors, warnings = validate_change_impact.validate_change_impact(metadata)
+        return validate_change_impact.report_validation(errors, warnings)
+
+    # all: one detection pass feeds prepare and validate without re-loading.
+    try:
+        metadata = change_detection.run_change_detection(
+            args.base, args.head, args.config, args.metadata_output
+        )
+    except change_detection.GitDiffError as exc:
+        print(f"git diff failed: {exc}", file=sys.stderr)
+        return 1
+    prepare_change_meta.prepare_change_metadata(metadata, args.config, args.output)
+    errors, warnings = validate_change_impact.validate_change_impact(metadata)
+    return validate_change_impact.report_validation(errors, warnings)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
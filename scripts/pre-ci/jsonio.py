@@ -0,0 +1,86 @@
+"""JSON serialization helpers shared by the pre-CI scripts.
+
+orjson serializes straight to bytes in compiled code, several times faster
+than the stdlib's pure-Python indent path; the stdlib writer is kept as a
+fallback so the scripts run on a bare interpreter.
+"""
+
+import json
+import mmap
+import os
+import pickle
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+SIDECAR_SUFFIX = ".cache.pkl"
+
+
+def _stat_key(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def dump_sidecar(obj, json_path):
+    """Write a binary sidecar so later phases can skip the JSON parse.
+
+    The sidecar is keyed on the JSON file's (mtime_ns, size), mirroring the
+    yaml_cache scheme, and is best-effort: failure to write it only costs
+    the downstream fast path.
+    """
+    try:
+        with open(json_path + SIDECAR_SUFFIX, "wb") as f:
+            pickle.dump((_stat_key(json_path), obj), f)
+    except OSError:
+        pass
+
+
+def _loads(buf):
+    """Parse JSON from a bytes-like buffer; orjson reads it without a str copy."""
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(bytes(buf))
+
+
+def load_json(path):
+    """Load a JSON document, preferring a fresh binary sidecar.
+
+    The JSON path memory-maps the file so the parser reads the page cache
+    directly instead of an up-front read() allocation.
+    """
+    try:
+        with open(path + SIDECAR_SUFFIX, "rb") as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == _stat_key(path):
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:  # mmap refuses empty maps
+            return _loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # orjson accepts memoryview but not the mmap object itself; the
+            # view is released before the map closes.
+            view = memoryview(mm)
+            try:
+                return _loads(view)
+            finally:
+                view.release()
+
+
+def dumps(obj):
+    """Serialize one object compactly to bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def dump_json(obj, path):
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2, sort_keys=True)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Turn change-metadata.json into per-stack deployment decisions.
+
+Reads the metadata produced by change_detection.py, applies the
+condition_mapping section of change-detection-config.yaml and writes a
+change-meta.json with one deploy/approval decision per stack.
+"""
+
+import sys
+
+from jsonio import dump_json, load_json
+
+DEFAULT_CONFIG_PATH = "scripts/pre-ci/change-detection-config.yaml"
+DEFAULT_METADATA_PATH = "change-metadata.json"
+DEFAULT_OUTPUT_PATH = "change-meta.json"
+
+IMPACT_ORDER = {"LOW": 0, "MEDIUM": 1, "HIGH": 2, "CRITICAL": 3}
+
+
+def load_change_metadata(metadata_path):
+    return load_json(metadata_path)
+
+
+def load_condition_mapping(config_path):
+    from yaml_cache import load_yaml_cached
+
+    config = load_yaml_cached(config_path)
+    return config.get("condition_mapping", {})
+
+
+def prepare_change_metadata(metadata, config_path, output_path):
+    """Derive deployment decisions; `metadata` is the loaded dict or a path."""
+    if not isinstance(metadata, dict):
+        metadata = load_change_metadata(metadata)
+    condition_mapping = load_condition_mapping(config_path)
+
+    checklist = metadata.get("deployment_checklist", {})
+    impact_levels = metadata.get("affected_resources", {}).get("impact_level", [])
+
+    max_impact = None
+    for level in impact_levels:
+        if level in IMPACT_ORDER and (
+            max_impact is None or IMPACT_ORDER[level] > IMPACT_ORDER[max_impact]
+        ):
+            max_impact = level
+
+    decisions = {}
+    for stack, triggered in checklist.items():
+        conditions = condition_mapping.get(stack, {})
+        threshold = conditions.get("approval_threshold")
+        requires_approval = bool(
+            triggered
+            and max_impact is not None
+            and threshold in IMPACT_ORDER
+            and IMPACT_ORDER[max_impact] >= IMPACT_ORDER[threshold]
+        )
+        decisions[stack] = {
+            "deploy": bool(triggered),
+            "workflow": conditions.get("workflow"),
+            "requires_approval": requires_approval,
+        }
+
+    change_meta = {
+        "base_commit": metadata.get("base_commit"),
+        "head_commit": metadata.get("head_commit"),
+        "max_impact_level": max_impact,
+        "required_actions": metadata.get("required_actions", []),
+        "stacks": decisions,
+    }
+
+    dump_json(change_meta, output_path)
+
+    deploying = [stack for stack, d in decisions.items() if d["deploy"]]
+    print(
+        f"Prepared deployment decisions for {len(decisions)} stack(s); "
+        f"{len(deploying)} to deploy; written to {output_path}"
+    )
+    return change_meta
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--metadata", default=DEFAULT_METADATA_PATH)
+    parser.add_argument("--config", default=DEFAULT_CONFIG_PATH)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH)
+    args = parser.parse_args()
+
+    try:
+        prepare_change_metadata(args.metadata, args.config, args.output)
+    except FileNotFoundError as exc:
+        print(f"missing input file: {exc.filename}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Parity checks for the change-detection matcher backends.
+
+Both backends must agree with plain fnmatch semantics — in particular,
+patterns match whole paths, not suffixes — and with each other when
+python-hyperscan is installed.
+"""
+
+import fnmatch
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import change_detection
+
+EXCLUSIONS = ["*.md", ".gitignore", "docs/*"]
+
+MAPPINGS = {
+    "vpc-module": {"patterns": ["cloudformation/modules/vpc.yaml"]},
+    "lambda-module": {"patterns": ["cloudformation/modules/lambda.yaml", "lambda/*"]},
+    "ci-workflows": {"patterns": [".github/workflows/*"]},
+    "environment-config": {"patterns": ["config/environments/*", "lambda/*"]},
+}
+
+# Includes prefixed variants of every pattern's match: an unanchored
+# (suffix) matcher would wrongly accept them.
+PATHS = [
+    "cloudformation/modules/vpc.yaml",
+    "nested/cloudformation/modules/vpc.yaml",
+    "lambda/handler.py",
+    "foo/lambda/handler.py",
+    ".github/workflows/deploy.yml",
+    "src/.github/workflows/fake.yml",
+    "config/environments/app.json",
+    "README.md",
+    "docs/guide.md",
+    ".gitignore",
+    "sub/.gitignore",
+]
+
+
+def fnmatch_reference(paths):
+    expected = {}
+    for path in paths:
+        if any(fnmatch.fnmatch(path, pattern) for pattern in EXCLUSIONS):
+            continue
+        keys = tuple(
+            key
+            for key, cfg in MAPPINGS.items()
+            if any(fnmatch.fnmatch(path, pattern) for pattern in cfg["patterns"])
+        )
+        if keys:
+            expected[path] = keys
+    return expected
+
+
+def sorted_keys(matches_by_file):
+    return {path: tuple(sorted(keys)) for path, keys in matches_by_file.items()}
+
+
+def test_regex_backend_matches_fnmatch(monkeypatch):
+    monkeypatch.setattr(change_detection, "hyperscan", None)
+    match_files = change_detection.build_matcher(EXCLUSIONS, MAPPINGS)
+    assert sorted_keys(match_files(PATHS)) == sorted_keys(fnmatch_reference(PATHS))
+
+
+@pytest.mark.skipif(
+    change_detection.hyperscan is None, reason="python-hyperscan not installed"
+)
+def test_hyperscan_backend_matches_regex_backend(monkeypatch):
+    hyperscan_matches = change_detection.build_matcher(EXCLUSIONS, MAPPINGS)(PATHS)
+    monkeypatch.setattr(change_detection, "hyperscan", None)
+    regex_matches = change_detection.build_matcher(EXCLUSIONS, MAPPINGS)(PATHS)
+    assert sorted_keys(hyperscan_matches) == sorted_keys(regex_matches)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Validate change-metadata.json before any deployment job runs.
+
+Fails the pipeline when the metadata produced by change_detection.py is
+structurally broken or when a CRITICAL change did not trigger a full
+redeploy.
+"""
+
+import sys
+
+from jsonio import load_json
+
+DEFAULT_METADATA_PATH = "change-metadata.json"
+
+REQUIRED_KEYS = (
+    "base_commit",
+    "head_commit",
+    "changed_files",
+    "affected_resources",
+    "affected_mappings",
+    "required_actions",
+    "deployment_checklist",
+)
+
+
+def load_change_metadata(metadata_path):
+    return load_json(metadata_path)
+
+
+def validate_change_impact(metadata):
+    errors = []
+    warnings = []
+
+    # Check 1: required top-level keys.
+    for key in REQUIRED_KEYS:
+        if key not in metadata:
+            errors.append(f"missing required key: {key}")
+    if errors:
+        return errors, warnings
+
+    # Check 2: changed_files is a list of paths.
+    changed_files = metadata["changed_files"]
+    if not isinstance(changed_files, list) or not all(
+        isinstance(path, str) for path in changed_files
+    ):
+        errors.append("changed_files must be a list of path strings")
+
+    # Check 3: affected_resources columns are parallel lists and
+    # affected_mappings agrees with them.
+    affected_resources = metadata["affected_resources"]
+    if not isinstance(affected_resources, dict) or not all(
+        isinstance(column, list) for column in affected_resources.values()
+    ):
+        errors.append("affected_resources must be a dict of column lists")
+        return errors, warnings
+    column_lengths = {len(column) for column in affected_resources.values()}
+    if len(column_lengths) > 1:
+        errors.append("affected_resources columns have differing lengths")
+        return errors, warnings
+    resource_count = column_lengths.pop() if column_lengths else 0
+    resource_mappings = set(affected_resources.get("mapping", []))
+    listed_mappings = set(metadata["affected_mappings"])
+    for mapping in listed_mappings - resource_mappings:
+        errors.append(f"affected_mappings lists '{mapping}' with no matching resource")
+    for mapping in resource_mappings - listed_mappings:
+        errors.append(f"resource mapping '{mapping}' missing from affected_mappings")
+
+    # Check 4: deployment_checklist values are booleans.
+    checklist = metadata["deployment_checklist"]
+    for stack, triggered in checklist.items():
+        if not isinstance(triggered, bool):
+            errors.append(f"deployment_checklist['{stack}'] is not a boolean")
+    if resource_count and not any(checklist.values()):
+        warnings.append("changes matched resources but no stack was triggered")
+
+    # Checks 5 and 6 share one pass over the resource columns: collect the
+    # missing-classification warnings and count CRITICAL rows as we go.
+    critical_count = 0
+    for file_path, resource_type, impact_level in zip(
+        affected_resources.get("file", []),
+        affected_resources.get("resource_type", []),
+        affected_resources.get("impact_level", []),
+    ):
+        if resource_type is None:
+            warnings.append(f"{file_path}: no resource_type recorded")
+        if impact_level is None:
+            warnings.append(f"{file_path}: no impact_level recorded")
+        elif impact_level == "CRITICAL":
+            critical_count += 1
+
+    # Check 6: CRITICAL changes must trigger every stack.
+    if critical_count and not all(checklist.values()):
+        errors.append(
+            f"{critical_count} CRITICAL resource(s) changed but not all "
+            "stacks are scheduled for deployment"
+        )
+
+    return errors, warnings
+
+
+def report_validation(errors, warnings):
+    """Print the validation outcome and return the process exit code."""
+    for warning in warnings:
+        print(f"WARNING: {warning}")
+    for error in errors:
+        print(f"ERROR: {error}", file=sys.stderr)
+
+    if errors:
+        print(f"validation failed with {len(errors)} error(s)", file=sys.stderr)
+        return 1
+    print("change metadata validated successfully")
+    return 0
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--metadata", default=DEFAULT_METADATA_PATH)
+    args = parser.parse_args()
+
+    try:
+        metadata = load_change_metadata(args.metadata)
+    except FileNotFoundError as exc:
+        print(f"missing input file: {exc.filename}", file=sys.stderr)
+        return 1
+
+    return report_validation(*validate_change_impact(metadata))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Cached YAML loading shared by the pre-CI scripts.
+
+Parsing the same change-detection-config.yaml in every pipeline phase pays
+the PyYAML parse cost repeatedly; a pickle sidecar keyed on the source
+file's (mtime_ns, size) turns every load after the first into a single
+pickle read.
+"""
+
+import os
+import pickle
+
+import yaml
+
+# The libyaml C loader parses several times faster than the pure-Python one;
+# the PyPI PyYAML wheels ship with it, so CI runners normally have it.
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
+CACHE_SUFFIX = ".cache.pkl"
+
+
+def load_yaml_cached(path):
+    stat = os.stat(path)
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+    cache_path = path + CACHE_SUFFIX
+
+    try:
+        with open(cache_path, "rb") as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == stat_key:
+            return data
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.load(f, Loader=_Loader)
+
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump((stat_key, data), f)
+    except OSError:
+        pass  # a read-only checkout just loses the cache, not the load
+
+    return data